@@ -0,0 +1,30 @@
+"""expense user date indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15 21:35:20
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_expenses_user_category_date', 'expenses', ['user_id', 'category', sa.literal_column('date DESC')], unique=False)
+    op.create_index('ix_expenses_user_date', 'expenses', ['user_id', sa.literal_column('date DESC'), sa.literal_column('id DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenses_user_date', table_name='expenses')
+    op.drop_index('ix_expenses_user_category_date', table_name='expenses')
@@ -0,0 +1,48 @@
+"""expense category varchar
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-15 21:38:02
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CATEGORIES = ('groceries', 'leisure', 'electronics', 'utilities', 'clothing', 'health', 'others')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The native enum stored member names (GROCERIES); the column stores values (groceries)
+    op.alter_column('expenses', 'category',
+               existing_type=sa.Enum(*(c.upper() for c in CATEGORIES), name='expensecategory'),
+               type_=sa.String(length=16),
+               existing_nullable=False,
+               postgresql_using='lower(category::text)')
+    sa.Enum(name='expensecategory').drop(op.get_bind())
+    op.create_check_constraint(
+        'ck_expense_category',
+        'expenses',
+        'category IN (%s)' % ', '.join(f"'{c}'" for c in CATEGORIES)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ck_expense_category', 'expenses', type_='check')
+    category_enum = sa.Enum(*(c.upper() for c in CATEGORIES), name='expensecategory')
+    category_enum.create(op.get_bind())
+    op.alter_column('expenses', 'category',
+               existing_type=sa.String(length=16),
+               type_=category_enum,
+               existing_nullable=False,
+               postgresql_using='upper(category)::expensecategory')
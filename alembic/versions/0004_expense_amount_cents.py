@@ -0,0 +1,38 @@
+"""expense amount cents
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-15 21:40:11
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('expenses', 'amount',
+               existing_type=sa.Numeric(precision=10, scale=2),
+               type_=sa.BigInteger(),
+               existing_nullable=False,
+               postgresql_using='(amount * 100)::bigint')
+    op.alter_column('expenses', 'amount', new_column_name='amount_cents')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('expenses', 'amount_cents', new_column_name='amount')
+    op.alter_column('expenses', 'amount',
+               existing_type=sa.BigInteger(),
+               type_=sa.Numeric(precision=10, scale=2),
+               existing_nullable=False,
+               postgresql_using='amount / 100.0')
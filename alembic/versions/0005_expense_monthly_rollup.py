@@ -0,0 +1,76 @@
+"""expense monthly rollup
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-15 21:41:50
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('expense_rollup_monthly',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(length=16), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('total_cents', sa.BigInteger(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'category', 'month')
+    )
+
+    # Backfill from existing expenses
+    op.execute("""
+        INSERT INTO expense_rollup_monthly (user_id, category, month, total_cents, count)
+        SELECT user_id, category, date_trunc('month', date)::date, sum(amount_cents), count(*)
+        FROM expenses
+        GROUP BY user_id, category, date_trunc('month', date)
+    """)
+
+    # Keep it in sync: subtract the old row, add the new one
+    op.execute("""
+        CREATE FUNCTION expense_rollup_monthly_apply() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                INSERT INTO expense_rollup_monthly AS r (user_id, category, month, total_cents, count)
+                VALUES (OLD.user_id, OLD.category, date_trunc('month', OLD.date)::date, -OLD.amount_cents, -1)
+                ON CONFLICT (user_id, category, month) DO UPDATE
+                SET total_cents = r.total_cents + EXCLUDED.total_cents,
+                    count = r.count + EXCLUDED.count;
+            END IF;
+
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO expense_rollup_monthly AS r (user_id, category, month, total_cents, count)
+                VALUES (NEW.user_id, NEW.category, date_trunc('month', NEW.date)::date, NEW.amount_cents, 1)
+                ON CONFLICT (user_id, category, month) DO UPDATE
+                SET total_cents = r.total_cents + EXCLUDED.total_cents,
+                    count = r.count + EXCLUDED.count;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER expenses_rollup_monthly
+        AFTER INSERT OR DELETE OR UPDATE OF user_id, category, date, amount_cents ON expenses
+        FOR EACH ROW EXECUTE FUNCTION expense_rollup_monthly_apply()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER expenses_rollup_monthly ON expenses")
+    op.execute("DROP FUNCTION expense_rollup_monthly_apply()")
+    op.drop_table('expense_rollup_monthly')
@@ -0,0 +1,68 @@
+"""user expenses version
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-15 21:48:16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('expenses_version', sa.BigInteger(), server_default='0', nullable=False))
+
+    # Statement-level, so a bulk insert bumps each affected user once
+    op.execute("""
+        CREATE FUNCTION expenses_bump_version() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE users SET expenses_version = expenses_version + 1
+                WHERE id IN (SELECT user_id FROM new_rows);
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE users SET expenses_version = expenses_version + 1
+                WHERE id IN (SELECT user_id FROM old_rows);
+            ELSE
+                UPDATE users SET expenses_version = expenses_version + 1
+                WHERE id IN (SELECT user_id FROM new_rows UNION SELECT user_id FROM old_rows);
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    # Transition tables allow only one event per trigger
+    op.execute("""
+        CREATE TRIGGER expenses_version_insert AFTER INSERT ON expenses
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION expenses_bump_version()
+    """)
+    op.execute("""
+        CREATE TRIGGER expenses_version_update AFTER UPDATE ON expenses
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION expenses_bump_version()
+    """)
+    op.execute("""
+        CREATE TRIGGER expenses_version_delete AFTER DELETE ON expenses
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION expenses_bump_version()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER expenses_version_delete ON expenses")
+    op.execute("DROP TRIGGER expenses_version_update ON expenses")
+    op.execute("DROP TRIGGER expenses_version_insert ON expenses")
+    op.execute("DROP FUNCTION expenses_bump_version()")
+    op.drop_column('users', 'expenses_version')
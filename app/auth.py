@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from app import schemas
@@ -14,6 +14,11 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
+# Built once instead of per call: jose otherwise re-parses the secret into a key on every decode
+_JWT_KEY = jwk.construct(SECRET_KEY, ALGORITHM)
+_JWT_ALGORITHMS = (ALGORITHM,)
+_JWT_OPTIONS = {"require_exp": True, "require_sub": True, "verify_aud": False}
+
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
 def hash_password(password: str) -> str:
@@ -34,23 +39,24 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=ALGORITHM)
     
     return encoded_jwt
 
 def verify_token(token: str) -> schemas.TokenData:
-    """Verify JWT token and extract username"""
+    """Verify JWT token and extract username and user id"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS, options=_JWT_OPTIONS)
         username: str = payload.get("sub")
+        user_id: int = payload.get("uid")
         
-        if username is None:
+        if username is None or user_id is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials"
             )
         
-        return schemas.TokenData(username=username)
+        return schemas.TokenData(username=username, user_id=user_id, exp=payload["exp"])
     
     except JWTError:
         raise HTTPException(
@@ -1,25 +1,69 @@
-from fastapi import Depends, HTTPException, status
+import hashlib
+import time
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models, auth
 from app.database import get_db
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+class RawHeaderBearer(OAuth2PasswordBearer):
+    """OAuth2PasswordBearer (same OpenAPI security scheme) that scans the raw ASGI header bytes"""
 
-def get_current_user(
+    async def __call__(self, request: Request) -> str:
+        for name, value in request.scope["headers"]:
+            if name == b"authorization":
+                if value[:7].lower() == b"bearer ":
+                    return value[7:].decode("latin-1")
+                break
+
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+oauth2_scheme = RawHeaderBearer(tokenUrl="auth/login", scheme_name="OAuth2PasswordBearer")
+
+# Token → (user id, token exp), so repeat requests skip JWT verification.
+# Only touched from async code on the event loop thread (TTLCache isn't thread-safe).
+_user_cache = TTLCache(maxsize=10000, ttl=30)
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+def invalidate_token(token: str) -> None:
+    """Drop a cached token, e.g. after password change or logout"""
+    _user_cache.pop(_token_key(token), None)
+
+async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    """Resolve the user id straight from the token, without touching the DB"""
+    key = _token_key(token)
+    cached = _user_cache.get(key)
+
+    # Entries past the token's own expiry are misses, so verify_token rejects it
+    if cached is not None and cached[1] > time.time():
+        return cached[0]
+
+    token_data = auth.verify_token(token)
+    _user_cache[key] = (token_data.user_id, token_data.exp)
+
+    return token_data.user_id
+
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> models.User:
-    token_data = auth.verify_token(token)
+    user_id = await get_current_user_id(token)
+
+    # Primary key lookup, served from the identity map when possible
+    user = await db.get(models.User, user_id)
 
-    user = db.query(models.User).filter(
-        models.User.username == token_data.username
-    ).first()
-    
     if user is None:
+        invalidate_token(token)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
-    
-    return user
\ No newline at end of file
+
+    return user
@@ -1,20 +1,34 @@
+from contextlib import asynccontextmanager
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from app import models
 from app.database import engine
 from app.routers import auth, expenses
 import os
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema is managed by Alembic (`alembic upgrade head`); tests apply the migrations
+    # here, since create_all would skip the triggers that maintain the rollup tables
+    if os.getenv("TESTING") == "1":
+        alembic_cfg = Config()
+        alembic_cfg.set_main_option("script_location", str(Path(__file__).parent.parent / "alembic"))
+        await run_in_threadpool(command.upgrade, alembic_cfg, "head")
+    yield
+    await engine.dispose()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Expense Tracker API",
     description="Track your expenses with authentication",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -30,11 +44,12 @@ app.add_middleware(
 app.include_router(auth.router)
 app.include_router(expenses.router)
 
-# Serve frontend
-@app.get("/")
-def root():
-    return FileResponse('frontend/index.html')
+# Serve frontend - behind nginx (BEHIND_PROXY=1) the proxy serves these files itself
+if os.getenv("BEHIND_PROXY") != "1":
+    @app.get("/")
+    def root():
+        return FileResponse('frontend/index.html')
 
-# Mount static files
-if os.path.exists('frontend'):
-    app.mount("/static", StaticFiles(directory="frontend"), name="static")
\ No newline at end of file
+    # Mount static files
+    if os.path.exists('frontend'):
+        app.mount("/static", StaticFiles(directory="frontend"), name="static")
\ No newline at end of file
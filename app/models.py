@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Numeric, Date
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Date, Index, CheckConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from decimal import Decimal
 import enum
 
 # Expense categories
@@ -23,9 +24,12 @@ class User(Base):
     email = Column(String(100), unique=True, nullable=False, index=True)
     hashed_password = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped by a trigger on every change to the user's expenses (list/summary ETags)
+    expenses_version = Column(BigInteger, nullable=False, server_default="0")
     
     # Relationship: 1 user → many expenses
-    expenses = relationship("Expense", back_populates="owner", cascade="all, delete-orphan")
+    # lazy="raise": load explicitly with selectinload() instead of an implicit query per access
+    expenses = relationship("Expense", back_populates="owner", cascade="all, delete-orphan", lazy="raise")
 
 # Expense model
 class Expense(Base):
@@ -33,12 +37,39 @@ class Expense(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    amount = Column(Numeric(10, 2), nullable=False)  # 10 digits, 2 decimal places
-    category = Column(Enum(ExpenseCategory), nullable=False)
+    amount_cents = Column(BigInteger, nullable=False)  # Amount in cents, see `amount`
+    category = Column(String(16), nullable=False)  # ExpenseCategory value, see ck_expense_category
     description = Column(String(500))
     date = Column(Date, nullable=False, index=True)  # Expense date
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationship: expense → user
-    owner = relationship("User", back_populates="expenses")
\ No newline at end of file
+    owner = relationship("User", back_populates="expenses", lazy="raise")
+    
+    @property
+    def amount(self) -> Decimal:
+        """Amount as a 2-decimal Decimal, as exposed by the API"""
+        return Decimal(self.amount_cents).scaleb(-2)
+    
+    __table_args__ = (
+        # Plain VARCHAR + CHECK instead of a native ENUM: adding a category is a constraint swap, not ALTER TYPE
+        CheckConstraint(
+            "category IN (%s)" % ", ".join(f"'{c.value}'" for c in ExpenseCategory),
+            name="ck_expense_category"
+        ),
+        # Serves "user's expenses, newest first" (and its keyset pages) as an ordered index range scan
+        Index("ix_expenses_user_date", user_id, date.desc(), id.desc()),
+        # Same, narrowed to one category (category filter, summary grouping)
+        Index("ix_expenses_user_category_date", user_id, category, date.desc()),
+    )
+
+# Monthly per-category totals, maintained by triggers on expenses (see alembic 0005)
+class ExpenseMonthlyTotal(Base):
+    __tablename__ = "expense_rollup_monthly"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    category = Column(String(16), primary_key=True)
+    month = Column(Date, primary_key=True)  # First day of the month
+    total_cents = Column(BigInteger, nullable=False)
+    count = Column(Integer, nullable=False)
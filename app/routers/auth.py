@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from app import models, schemas, auth
 from app.database import get_db
@@ -12,9 +14,11 @@ router = APIRouter(
 )
 
 @router.post("/signup", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
-def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def signup(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
 
-    existing_user = db.query(models.User).filter(models.User.username == user.username).first()
+    existing_user = (await db.execute(
+        select(models.User).where(models.User.username == user.username)
+    )).scalar_one_or_none()
     
     if existing_user:
         raise HTTPException(
@@ -22,7 +26,9 @@ def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
             detail="Username already registered"
         )
     
-    existing_email = db.query(models.User).filter(models.User.email == user.email).first()
+    existing_email = (await db.execute(
+        select(models.User).where(models.User.email == user.email)
+    )).scalar_one_or_none()
     
     if existing_email:
         raise HTTPException(
@@ -30,7 +36,8 @@ def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
             detail="Email already registered"
         )
     
-    hashed_password = auth.hash_password(user.password)
+    # Argon2 is CPU-heavy, keep it off the event loop
+    hashed_password = await run_in_threadpool(auth.hash_password, user.password)
     
     new_user = models.User(
         username=user.username,
@@ -39,15 +46,17 @@ def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return new_user
 
 @router.post("/login", response_model=schemas.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(),db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(),db: AsyncSession = Depends(get_db)):
 
-    user = db.query(models.User).filter(models.User.username == form_data.username).first()
+    user = (await db.execute(
+        select(models.User).where(models.User.username == form_data.username)
+    )).scalar_one_or_none()
     
     if not user:
         raise HTTPException(
@@ -56,7 +65,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(),db: Session = Depends
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    if not auth.verify_password(form_data.password, user.hashed_password):
+    if not await run_in_threadpool(auth.verify_password, form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -66,7 +75,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(),db: Session = Depends
     # Create access token
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
-        data={"sub": user.username},
+        data={"sub": user.username, "uid": user.id},
         expires_delta=access_token_expires
     )
     
@@ -76,5 +85,5 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(),db: Session = Depends
     }
 
 @router.get("/me", response_model=schemas.UserResponse)
-def get_me(current_user: models.User = Depends(get_current_user)):
+async def get_me(current_user: models.User = Depends(get_current_user)):
     return current_user
\ No newline at end of file
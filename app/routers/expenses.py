@@ -1,24 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Body, Depends, HTTPException, Path, status, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, cast, bindparam, or_, BigInteger, Date, Integer, String, insert, select, update, delete, tuple_
+import calendar
+import hashlib
 from typing import Optional
+from collections import defaultdict
 from datetime import date, timedelta
 from app import models, schemas
 from app.database import get_db
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user_id
 
 router = APIRouter(
     prefix="/expenses",
     tags=["Expenses"]
 )
 
+# Look-back window in days for the ?period= filter
+PERIOD_DAYS = {
+    "week": 7,
+    "month": 30,
+    "3months": 90
+}
+
+# Columns an update may not set to NULL
+NOT_NULL_FIELDS = ("amount", "category", "date")
+
+def _to_row(data: dict) -> dict:
+    """Map dumped expense fields to Expense columns (amount → amount_cents)"""
+    if "amount" in data:
+        data["amount_cents"] = schemas.to_cents(data.pop("amount"))
+    return data
+
 # ========== CREATE EXPENSE ==========
 
 @router.post("/", response_model=schemas.ExpenseResponse, status_code=status.HTTP_201_CREATED)
-def create_expense(
+async def create_expense(
     expense: schemas.ExpenseCreate,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create new expense
@@ -26,89 +46,161 @@ def create_expense(
     Automatically assigns to current user
     """
     new_expense = models.Expense(
-        **expense.model_dump(),
-        user_id=current_user.id
+        **_to_row(expense.model_dump()),
+        user_id=user_id
     )
     
     db.add(new_expense)
-    db.commit()
-    db.refresh(new_expense)
+    await db.commit()
+    await db.refresh(new_expense)
     
     return new_expense
 
+# ========== BULK CREATE EXPENSES ==========
+
+@router.post("/bulk", response_model=list[int], status_code=status.HTTP_201_CREATED)
+async def create_expenses_bulk(
+    expenses: list[schemas.ExpenseCreate] = Body(..., max_length=1000),  # One insertmanyvalues page
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create many expenses in one request
+    
+    Inserted in a single transaction, returns the new expense IDs in request order
+    """
+    if not expenses:
+        return []
+    
+    async with db.begin():
+        result = await db.execute(
+            insert(models.Expense).returning(models.Expense.id, sort_by_parameter_order=True),
+            [_to_row(expense.model_dump()) | {"user_id": user_id} for expense in expenses]
+        )
+        ids = list(result.scalars())
+    
+    return ids
+
 # ========== GET ALL EXPENSES (with filters) ==========
 
-@router.get("/", response_model=list[schemas.ExpenseResponse])
-def get_expenses(
+MAX_ID = 2**31 - 1
+_category = bindparam("category", type_=String)
+
+# One statement for every filter combination, so SQLAlchemy compiles it once
+# and Postgres reuses a single prepared statement / plan
+EXPENSES_PAGE_QUERY = (
+    select(models.Expense)
+    .where(
+        models.Expense.user_id == bindparam("user_id", type_=Integer),
+        models.Expense.date >= bindparam("start", type_=Date),
+        models.Expense.date <= bindparam("end", type_=Date),
+        or_(_category.is_(None), models.Expense.category == _category),
+        # Keyset pagination - continue after the last (date, id) of the previous page
+        tuple_(models.Expense.date, models.Expense.id) < tuple_(
+            bindparam("cursor_date", type_=Date),
+            bindparam("cursor_id", type_=Integer)
+        )
+    )
+    # Order by date (newest first)
+    .order_by(models.Expense.date.desc(), models.Expense.id.desc())
+    .limit(bindparam("limit", type_=Integer))
+)
+
+@router.get("/", responses={200: {"model": schemas.ExpensePage}})
+async def get_expenses(
+    request: Request,
     period: Optional[str] = Query(None, description="week, month, 3months"),
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     category: Optional[models.ExpenseCategory] = None,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Get all expenses for current user with optional filters
+    Get expenses for current user with optional filters, newest first
     
     Filters:
       - period: week, month, 3months
       - start_date & end_date: custom date range
       - category: filter by expense category
+    
+    Paginated: pass next_cursor back as cursor to get the following page
+    Supports If-None-Match: returns 304 when nothing changed since the ETag
     """
-    # Base query - only current user's expenses
-    query = db.query(models.Expense).filter(
-        models.Expense.user_id == current_user.id
-    )
+    etag = await _expenses_etag(db, user_id)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
     
-    # Date filtering
-    if period:
-        today = date.today()
-        
-        if period == "week":
-            start = today - timedelta(days=7)
-            query = query.filter(models.Expense.date >= start)
-        
-        elif period == "month":
-            start = today - timedelta(days=30)
-            query = query.filter(models.Expense.date >= start)
-        
-        elif period == "3months":
-            start = today - timedelta(days=90)
-            query = query.filter(models.Expense.date >= start)
+    # Resolve filters to concrete bounds; unset filters fall back to sentinels
+    start = start_date or date.min
     
-    # Custom date range
-    if start_date:
-        query = query.filter(models.Expense.date >= start_date)
+    days = PERIOD_DAYS.get(period)
+    if days:
+        start = max(start, date.today() - timedelta(days=days))
     
-    if end_date:
-        query = query.filter(models.Expense.date <= end_date)
+    cursor_date, cursor_id = _decode_cursor(cursor) if cursor else (date.max, MAX_ID)
     
-    # Category filter
-    if category:
-        query = query.filter(models.Expense.category == category)
+    expenses = list((await db.execute(EXPENSES_PAGE_QUERY, {
+        "user_id": user_id,
+        "start": start,
+        "end": end_date or date.max,
+        "category": category.value if category else None,
+        "cursor_date": cursor_date,
+        "cursor_id": cursor_id,
+        # Fetch one extra row to detect a next page
+        "limit": limit + 1
+    })).scalars())
     
-    # Order by date (newest first)
-    expenses = query.order_by(models.Expense.date.desc()).all()
+    next_cursor = None
+    if len(expenses) > limit:
+        expenses = expenses[:limit]
+        last = expenses[-1]
+        next_cursor = f"{last.date.isoformat()}:{last.id}"
+    
+    # Serialize directly instead of a second validation pass through response_model
+    items = schemas.EXPENSE_LIST_ADAPTER.validate_python(expenses, from_attributes=True)
     
-    return expenses
+    return ORJSONResponse({
+        "items": schemas.EXPENSE_LIST_ADAPTER.dump_python(items, mode="json"),
+        "next_cursor": next_cursor
+    }, headers=_etag_headers(etag))
+
+def _decode_cursor(cursor: str) -> tuple[date, int]:
+    """Parse a "{date}:{id}" pagination cursor"""
+    try:
+        cursor_date, cursor_id = cursor.split(":")
+        cursor_date, cursor_id = date.fromisoformat(cursor_date), int(cursor_id)
+        # Out of INTEGER range would fail at bind time with a 500
+        if not 0 < cursor_id <= MAX_ID:
+            raise ValueError(cursor_id)
+        return cursor_date, cursor_id
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
 
 # ========== GET SINGLE EXPENSE ==========
 
 @router.get("/{expense_id}", response_model=schemas.ExpenseResponse)
-def get_expense(
-    expense_id: int,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_expense(
+    expense_id: int = Path(..., ge=1, le=MAX_ID),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get single expense by ID
     
     Only returns if expense belongs to current user
     """
-    expense = db.query(models.Expense).filter(
-        models.Expense.id == expense_id,
-        models.Expense.user_id == current_user.id
-    ).first()
+    expense = (await db.execute(
+        select(models.Expense).where(
+            models.Expense.id == expense_id,
+            models.Expense.user_id == user_id
+        )
+    )).scalar_one_or_none()
     
     if not expense:
         raise HTTPException(
@@ -121,11 +213,11 @@ def get_expense(
 # ========== UPDATE EXPENSE ==========
 
 @router.put("/{expense_id}", response_model=schemas.ExpenseResponse)
-def update_expense(
-    expense_id: int,
-    expense_update: schemas.ExpenseUpdate,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def update_expense(
+    expense_id: int = Path(..., ge=1, le=MAX_ID),
+    expense_update: schemas.ExpenseUpdate = Body(...),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update expense
@@ -133,11 +225,30 @@ def update_expense(
     Only updates if expense belongs to current user
     Partial update - only provided fields are updated
     """
-    # Find expense
-    expense = db.query(models.Expense).filter(
-        models.Expense.id == expense_id,
-        models.Expense.user_id == current_user.id
-    ).first()
+    # Update only provided fields
+    update_data = expense_update.model_dump(exclude_unset=True)
+    
+    # An explicit null can only clear the description
+    null_fields = [field for field in NOT_NULL_FIELDS if field in update_data and update_data[field] is None]
+    if null_fields:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Cannot set {', '.join(null_fields)} to null"
+        )
+    
+    if not update_data:
+        return await get_expense(expense_id, user_id, db)
+    
+    # Ownership check and update in one statement
+    expense = (await db.execute(
+        update(models.Expense)
+        .where(
+            models.Expense.id == expense_id,
+            models.Expense.user_id == user_id
+        )
+        .values(**_to_row(update_data))
+        .returning(models.Expense)
+    )).scalar_one_or_none()
     
     if not expense:
         raise HTTPException(
@@ -145,95 +256,197 @@ def update_expense(
             detail="Expense not found"
         )
     
-    # Update only provided fields
-    update_data = expense_update.model_dump(exclude_unset=True)
-    
-    for key, value in update_data.items():
-        setattr(expense, key, value)
-    
-    db.commit()
-    db.refresh(expense)
+    await db.commit()
     
     return expense
 
 # ========== DELETE EXPENSE ==========
 
 @router.delete("/{expense_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_expense(
-    expense_id: int,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def delete_expense(
+    expense_id: int = Path(..., ge=1, le=MAX_ID),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete expense
     
     Only deletes if expense belongs to current user
     """
-    expense = db.query(models.Expense).filter(
-        models.Expense.id == expense_id,
-        models.Expense.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        delete(models.Expense).where(
+            models.Expense.id == expense_id,
+            models.Expense.user_id == user_id
+        )
+    )
     
-    if not expense:
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Expense not found"
         )
     
-    db.delete(expense)
-    db.commit()
+    await db.commit()
     
     return None
 
 # ========== GET SUMMARY ==========
 
+# Below this many expenses, summing rows in Python beats a GROUP BY plan
+SMALL_ACCOUNT_EXPENSES = 500
+
 @router.get("/summary/stats", response_model=schemas.ExpenseSummary)
-def get_summary(
+async def get_summary(
+    request: Request,
+    response: Response,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get expense summary by category
     
     Returns total amount and count per category
+    Supports If-None-Match: returns 304 when nothing changed since the ETag
     """
-    # Base query
-    query = db.query(
-        models.Expense.category,
-        func.sum(models.Expense.amount).label('total'),
-        func.count(models.Expense.id).label('count')
-    ).filter(
-        models.Expense.user_id == current_user.id
-    )
+    etag = await _expenses_etag(db, user_id)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    
+    response.headers.update(_etag_headers(etag))
+    
+    rollup = models.ExpenseMonthlyTotal
+    
+    if _is_whole_months(start_date, end_date):
+        # Range covers whole months - read the precomputed monthly rollup
+        query = select(
+            rollup.category,
+            cast(func.sum(rollup.total_cents), BigInteger).label('total'),
+            cast(func.sum(rollup.count), Integer).label('count')
+        ).where(
+            rollup.user_id == user_id,
+            rollup.count > 0
+        )
+        
+        if start_date:
+            query = query.where(rollup.month >= start_date)
+        
+        if end_date:
+            query = query.where(rollup.month <= end_date)
+        
+        # Group by category, ROLLUP adds the grand total row (category IS NULL)
+        results = (await db.execute(
+            query.group_by(func.rollup(rollup.category))
+        )).all()
+        
+        return _build_summary(results)
+    
+    # Arbitrary range - aggregate the raw expenses
+    filters = [models.Expense.user_id == user_id]
     
     # Date filters
     if start_date:
-        query = query.filter(models.Expense.date >= start_date)
+        filters.append(models.Expense.date >= start_date)
     
     if end_date:
-        query = query.filter(models.Expense.date <= end_date)
+        filters.append(models.Expense.date <= end_date)
+    
+    # The rollup table gives the user's total expense count cheaply
+    expense_count = (await db.execute(
+        select(func.sum(rollup.count)).where(rollup.user_id == user_id)
+    )).scalar() or 0
     
-    # Group by category
-    results = query.group_by(models.Expense.category).all()
+    if expense_count < SMALL_ACCOUNT_EXPENSES:
+        # Small account - stream the rows and sum them here
+        totals = defaultdict(lambda: [0, 0])
+        
+        for category, amount_cents in await db.execute(
+            select(models.Expense.category, models.Expense.amount_cents).where(*filters)
+        ):
+            totals[category][0] += amount_cents
+            totals[category][1] += 1
+        
+        results = [(category, total, count) for category, (total, count) in totals.items()]
+        results.append((
+            None,
+            sum(total for _, total, _ in results),
+            sum(count for _, _, count in results)
+        ))
+        
+        return _build_summary(results)
+    
+    query = select(
+        models.Expense.category,
+        cast(func.sum(models.Expense.amount_cents), BigInteger).label('total'),
+        func.count(models.Expense.id).label('count')
+    ).where(*filters)
     
-    # Calculate totals
-    total_amount = sum(r.total for r in results)
-    total_count = sum(r.count for r in results)
+    # Group by category, ROLLUP adds the grand total row (category IS NULL)
+    results = (await db.execute(
+        query.group_by(func.rollup(models.Expense.category))
+    )).all()
     
-    # Format category summaries
-    categories = [
-        schemas.CategorySummary(
-            category=r.category,
-            total=r.total,
-            count=r.count
-        )
-        for r in results
-    ]
+    return _build_summary(results)
+
+def _build_summary(results) -> schemas.ExpenseSummary:
+    """Format (category, total cents, count) rows; the category=None row is the grand total"""
+    total_cents = 0
+    total_count = 0
+    categories = []
+    
+    for category, total, count in results:
+        if category is None:
+            total_cents = total or 0
+            total_count = count or 0
+        else:
+            categories.append(schemas.CategorySummary(
+                category=category,
+                total=schemas.from_cents(total),
+                count=count
+            ))
     
     return schemas.ExpenseSummary(
-        total_amount=total_amount,
+        total_amount=schemas.from_cents(total_cents),
         total_count=total_count,
         categories=categories
-    )
\ No newline at end of file
+    )
+
+def _is_whole_months(start_date: Optional[date], end_date: Optional[date]) -> bool:
+    """True if the range starts on a month's first day and ends on its last day (open ends count)"""
+    if start_date and start_date.day != 1:
+        return False
+    
+    # monthrange, not end_date + 1 day, which overflows at date.max
+    if end_date and end_date.day != calendar.monthrange(end_date.year, end_date.month)[1]:
+        return False
+    
+    return True
+
+# ========== CONDITIONAL GET (ETag) ==========
+
+async def _expenses_etag(db: AsyncSession, user_id: int) -> str:
+    """Weak ETag over the user's expenses: changes on any insert, update or delete"""
+    # Primary key lookup of a counter the expenses triggers bump (alembic 0006)
+    version = (await db.execute(
+        select(models.User.expenses_version).where(models.User.id == user_id)
+    )).scalar()
+    
+    # today: relative ?period= windows move even when the data doesn't
+    state = f"{user_id}:{version}:{date.today()}"
+    return f'W/"{hashlib.blake2b(state.encode(), digest_size=12).hexdigest()}"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in tags or "*" in tags
+
+def _etag_headers(etag: str) -> dict:
+    # private, no-cache: browsers keep the response but revalidate it every time
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_etag_headers(etag))
\ No newline at end of file
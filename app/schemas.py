@@ -1,9 +1,17 @@
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter, field_validator
 from datetime import datetime, date
 from typing import Optional
 from decimal import Decimal
 from app.models import ExpenseCategory
 
+def to_cents(amount: Decimal) -> int:
+    """Convert a 2-decimal amount to integer cents (storage format)"""
+    return int(amount * 100)
+
+def from_cents(cents: int) -> Decimal:
+    """Convert integer cents back to a 2-decimal amount"""
+    return Decimal(cents).scaleb(-2)
+
 class UserBase(BaseModel):
     username: str = Field(..., min_length=3, max_length=50)
     email: EmailStr
@@ -12,11 +20,10 @@ class UserCreate(UserBase):
     password: str = Field(..., min_length=6)
 
 class UserResponse(UserBase):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     created_at: datetime
-    
-    class Config:
-        from_attributes = True
 
 class UserLogin(BaseModel):
     username: str
@@ -45,13 +52,19 @@ class ExpenseUpdate(BaseModel):
     date: Optional[date] = None
 
 class ExpenseResponse(ExpenseBase):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     user_id: int
     created_at: datetime
     updated_at: Optional[datetime]
-    
-    class Config:
-        from_attributes = True
+
+# Built once; validates + dumps a whole list of ORM rows in pydantic-core
+EXPENSE_LIST_ADAPTER = TypeAdapter(list[ExpenseResponse])
+
+class ExpensePage(BaseModel):
+    items: list[ExpenseResponse]
+    next_cursor: Optional[str] = None
 
 class Token(BaseModel):
     access_token: str
@@ -59,6 +72,8 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     username: Optional[str] = None
+    user_id: int
+    exp: int
 
 class CategorySummary(BaseModel):
     category: ExpenseCategory